@@ -55,3 +55,79 @@ with open('script_2.txt') as f:
 
         print(line, end="")
         print('-' * 20)
+
+"""
+1.3.1 Searching a large file with context, without reading it line by line
+
+Problem: search() copies every line of the file into its deque, even though most lines never
+         match. On a huge file with few matches, nearly all of that work is thrown away.
+
+Solution: memory-map the file and let bytes.find() (or a bytes regex) jump straight from one
+          match to the next. The previous lines are only needed when there is a match, so they
+          are recovered by scanning backwards from the start of the matching line with rfind().
+"""
+
+import mmap
+import os
+import re
+
+
+def search_mmap(filename, pattern, history=5):
+    if not os.path.getsize(filename):
+        return
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        if isinstance(pattern, re.Pattern):
+            def next_match(pos):
+                match = pattern.search(m, pos)
+                return match.start() if match else -1
+        else:
+            def next_match(pos):
+                return m.find(pattern, pos)
+
+        pos = 0
+        while True:
+            offset = next_match(pos)
+            if offset == -1:
+                return
+            start = m.rfind(b'\n', 0, offset) + 1
+            end = m.find(b'\n', offset)
+            end = len(m) if end == -1 else end + 1
+
+            previous_lines = []
+            line_start = start
+            while line_start and len(previous_lines) < history:
+                prev_start = m.rfind(b'\n', 0, line_start - 1) + 1
+                previous_lines.append(m[prev_start:line_start])
+                line_start = prev_start
+            previous_lines.reverse()
+
+            yield m[start:end], previous_lines
+            pos = end          # one result per line, like search()
+
+for line, prevlines in search_mmap('script_2.txt', b'python', 5):
+    for pline in prevlines:
+        print(pline.decode(), end="")
+    print(line.decode(), end="")
+    print('-' * 20)
+
+# On a big file with only a few matches, the mmap version skips the lines in between entirely.
+import random
+import tempfile
+import time
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'big.txt')
+    with open(path, 'w') as f:
+        for n in range(2_000_000):
+            word = 'python' if random.random() < 0.0001 else 'generator'
+            f.write(f'line {n}: a {word} walks into a deque\n')
+
+    start = time.perf_counter()
+    with open(path) as f:
+        expected = [(line, list(prev)) for line, prev in search(f, 'python', 5)]
+    print(f'deque search: {len(expected)} matches in {time.perf_counter() - start:.3f}s')
+
+    start = time.perf_counter()
+    found = list(search_mmap(path, b'python', 5))
+    print(f'mmap search:  {len(found)} matches in {time.perf_counter() - start:.3f}s')
+    assert [(line.decode(), [p.decode() for p in prev]) for line, prev in found] == expected
@@ -34,3 +34,155 @@ original = [1, 8, 2, 23, 7, -4, 18, 23, 42, 37, 2]
 heap = list(original)
 heapify(heap)
 print(f"{original} --> heapify --> {heap}")
+
+"""
+1.4.1 Keeping the top N up to date over a stream
+
+Problem: instead of a fixed portfolio, prices arrive as an endless stream of updates, and you
+         want the N cheapest and N most expensive instruments at any moment. Calling nsmallest()
+         and nlargest() over everything seen so far gets slower the longer the stream runs.
+
+Solution: keep a bounded min-heap of the best candidates. A new value only has to beat the top
+          of the heap to get in, and then it replaces it with heapreplace(). A price change for an
+          instrument already in the heap marks its old entry as dead (to be skipped later) and
+          pushes the new one. Every update is O(log K) and memory stays O(K).
+
+          An instrument that drops out is forgotten, so when a tracked price gets worse, one of
+          the forgotten ones might have deserved its place. A few extra slots (slack) beyond the
+          N that are reported make that less likely, but top() is only approximate in this mode.
+          When the answer has to be right, pass exact=True: the latest entry of every instrument
+          is kept (memory grows to O(number of instruments)) in a heap with the best on top,
+          dead entries are skipped lazily, and top(N) walks just the top of the heap in
+          O(N log N) instead of sorting everything.
+"""
+
+from heapq import heappush, heappop, heapreplace
+from operator import itemgetter
+
+class TopK(object):
+    def __init__(self, n, key=None, largest=True, slack=None, exact=False) -> None:
+        self.n = n
+        self.key = key
+        self.largest = largest
+        self.exact = exact
+        self.capacity = n + (n if slack is None else slack)
+        # entries [score, seq, name, value, alive]; the worst candidate on top, or the best
+        # one when exact (scores are negated then)
+        self._heap = []
+        self._entries = {}   # name -> live entry
+        self._seq = 0
+        self._dead = 0
+
+    def _score(self, value):
+        score = self.key(value) if self.key else value
+        return score if self.largest != self.exact else -score
+
+    def _discard(self, entry):
+        entry[-1] = False
+        self._dead += 1
+        if self._dead > len(self._entries):
+            self._heap = [e for e in self._heap if e[-1]]
+            heapify(self._heap)
+            self._dead = 0
+
+    def _clear_top(self):
+        while self._heap and not self._heap[0][-1]:
+            heappop(self._heap)
+            self._dead -= 1
+
+    def update(self, name, value):
+        old = self._entries.pop(name, None)
+        if old is not None:
+            self._discard(old)
+        self._seq += 1
+        entry = [self._score(value), self._seq, name, value, True]
+        if self.exact or len(self._entries) < self.capacity:
+            heappush(self._heap, entry)
+        else:
+            self._clear_top()
+            if entry[0] <= self._heap[0][0]:
+                return
+            evicted = heapreplace(self._heap, entry)
+            del self._entries[evicted[2]]
+        self._entries[name] = entry
+
+    def update_many(self, items):
+        for name, value in items:
+            self.update(name, value)
+
+    def top(self, n=None):
+        n = self.n if n is None else n
+        if not self.exact:
+            live = sorted(self._entries.values(), reverse=True)
+            return [entry[3] for entry in live[:n]]
+        # best-first walk down the heap: a node's children are never better than the node
+        result = []
+        frontier = [(self._heap[0], 0)] if self._heap else []
+        while frontier and len(result) < n:
+            entry, i = heappop(frontier)
+            if entry[-1]:
+                result.append(entry[3])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._heap):
+                    heappush(frontier, (self._heap[child], child))
+        return result
+
+    def merge(self, other):
+        # combine a tracker from another worker; for shared names, the other one's value wins
+        for entry in sorted(other._entries.values(), key=itemgetter(1)):
+            self.update(entry[2], entry[3])
+        return self
+
+    def __add__(self, other):
+        result = TopK(self.n, self.key, self.largest, self.capacity - self.n, self.exact)
+        result.merge(self)
+        return result.merge(other)
+
+price = itemgetter('price')
+cheap = TopK(3, key=price, largest=False)
+expen = TopK(3, key=price)
+for stock in portfolio:
+    cheap.update(stock['name'], stock)
+    expen.update(stock['name'], stock)
+for stock in ({'name': 'FB', 'shares': 200, 'price': 600.0}, {'name': 'AAPL', 'shares': 50, 'price': 10.0}):
+    cheap.update(stock['name'], stock)
+    expen.update(stock['name'], stock)
+print(f"Cheapest (3): {[s['name'] for s in cheap.top()]}")
+print(f"Expensive (3): {[s['name'] for s in expen.top()]}\n")
+
+# How often the bounded tracker gets it wrong depends on the stream. Here, 30 symbols are
+# repriced at random and both modes are checked against nlargest() over the latest prices.
+import random
+
+misses = {False: 0, True: 0}
+for seed in range(300):
+    rng = random.Random(seed)
+    trackers = {exact: TopK(3, exact=exact) for exact in misses}
+    latest = {}
+    for _ in range(rng.randrange(1, 500)):
+        name, value = rng.randrange(30), rng.random()
+        latest[name] = value
+        for tracker in trackers.values():
+            tracker.update(name, value)
+    for exact, tracker in trackers.items():
+        misses[exact] += tracker.top() != nlargest(3, latest.values())
+print(f"wrong top 3 in 300 streams: approximate {misses[False]}, exact {misses[True]}\n")
+
+# Trackers are plain data (with a picklable key like itemgetter), so each worker process can
+# follow its own shard of the stream and the parent adds the results together.
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+def track_shard(seed, updates=100_000, symbols=5_000):
+    rng = random.Random(seed)
+    tracker = TopK(5, key=price)
+    for _ in range(updates):
+        name = f'SYM{rng.randrange(symbols)}'
+        tracker.update(name, {'name': name, 'price': round(rng.uniform(1, 1000), 2)})
+    return tracker
+
+if __name__ == '__main__':
+    with ProcessPoolExecutor() as pool:
+        trackers = list(pool.map(track_shard, range(4)))
+    merged = reduce(TopK.__add__, trackers)
+    print(f"Top 5 across shards: {[(s['name'], s['price']) for s in merged.top()]}")
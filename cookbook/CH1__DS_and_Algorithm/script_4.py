@@ -58,3 +58,205 @@ By keeping a constantly increasing index, the items will be sorted according to
 in which they were inserted. However, the index also serves an important role in making
 the comparison operations work for items that have the same priority level.
 """
+
+"""
+1.5.1 Changing priorities and cancelling queued items
+
+Problem: a scheduler needs to change the priority of items that are already queued, or cancel
+         them, and there may be millions of them. With the plain PriorityQueue above, the only
+         way to do that is to search the list, modify it and heapify() it again, which is O(N)
+         per change.
+
+Solution: give every pushed item a handle. Changing or removing an item doesn't touch the heap;
+          the old entry is only marked as removed (a tombstone) and a new entry is pushed if needed.
+          pop() and peek() skip tombstones as they reach the top of the heap, and once more than
+          half of the heap is dead it is compacted in a single pass. This is the approach suggested
+          in the documentation of the heapq module. A handle is only valid while its item is
+          queued: changing or removing it after it was popped or removed raises a KeyError that
+          names the handle.
+"""
+
+import itertools
+
+_REMOVED = object()     # placeholder for a cancelled entry
+
+class IndexedPriorityQueue(object):
+    compact_min = 1024  # don't bother compacting very small heaps
+
+    def __init__(self) -> None:
+        self._queue = []
+        self._entries = {}      # handle -> live entry [-priority, index, handle, item]
+        self._counter = itertools.count()
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def push(self, item, priority):
+        handle = next(self._counter)
+        self._push_entry(handle, item, priority)
+        return handle
+
+    def _push_entry(self, handle, item, priority):
+        entry = [-priority, next(self._counter), handle, item]
+        self._entries[handle] = entry
+        heapq.heappush(self._queue, entry)
+
+    def _kill(self, handle):
+        try:
+            entry = self._entries.pop(handle)
+        except KeyError:
+            raise KeyError(f'handle {handle!r} is not queued (already popped or removed)') from None
+        item = entry[-1]
+        entry[-1] = _REMOVED
+        self._dead += 1
+        if self._dead > self.compact_min and self._dead * 2 > len(self._queue):
+            self._queue = [e for e in self._queue if e[-1] is not _REMOVED]
+            heapq.heapify(self._queue)
+            self._dead = 0
+        return item
+
+    def update_priority(self, handle, priority):
+        item = self._kill(handle)
+        self._push_entry(handle, item, priority)
+
+    def remove(self, handle):
+        return self._kill(handle)
+
+    def _clear_top(self):
+        queue = self._queue
+        while queue and queue[0][-1] is _REMOVED:
+            heapq.heappop(queue)
+            self._dead -= 1
+        if not queue:
+            raise IndexError('pop from an empty priority queue')
+
+    def peek(self):
+        self._clear_top()
+        return self._queue[0][-1]
+
+    def pop(self):
+        self._clear_top()
+        entry = heapq.heappop(self._queue)
+        del self._entries[entry[2]]
+        return entry[-1]
+
+q = IndexedPriorityQueue()
+foo = q.push(Item('foo'), 1)
+bar = q.push(Item('bar'), 5)
+jon = q.push(Item('jon'), 4)
+doe = q.push(Item('doe'), 1)
+q.update_priority(doe, 10)
+q.remove(bar)
+print(f"peek --> {q.peek()}")
+print(f"1. q.pop() --> {q.pop()}")
+print(f"2. q.pop() --> {q.pop()}")
+print(f"3. q.pop() --> {q.pop()}")
+
+"""
+For a queue shared between threads, every operation takes the same lock, and a condition
+variable lets pop() wait for an item to arrive. For asyncio, the code runs in a single thread,
+so no lock is needed; get() instead parks a future that the next push() completes, the same
+way asyncio.Queue does it.
+"""
+
+import asyncio
+import collections
+import threading
+
+class ThreadSafeIndexedPriorityQueue(IndexedPriorityQueue):
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+
+    def push(self, item, priority):
+        with self._lock:
+            handle = super().push(item, priority)
+            self._not_empty.notify()
+            return handle
+
+    def update_priority(self, handle, priority):
+        with self._lock:
+            super().update_priority(handle, priority)
+
+    def remove(self, handle):
+        with self._lock:
+            return super().remove(handle)
+
+    def peek(self):
+        with self._lock:
+            return super().peek()
+
+    def pop(self, block=True, timeout=None):
+        with self._not_empty:
+            if block and not self._not_empty.wait_for(self.__len__, timeout):
+                raise IndexError('pop from an empty priority queue')
+            return super().pop()
+
+class AsyncIndexedPriorityQueue(IndexedPriorityQueue):
+    def __init__(self) -> None:
+        super().__init__()
+        self._waiters = collections.deque()
+
+    def push(self, item, priority):
+        handle = super().push(item, priority)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+        return handle
+
+    async def get(self):
+        while not len(self):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        return self.pop()
+
+def thread_demo():
+    queue = ThreadSafeIndexedPriorityQueue()
+    results = []
+    consumer = threading.Thread(target=lambda: results.extend(queue.pop() for _ in range(3)))
+    consumer.start()
+    for name, priority in [('a', 1), ('b', 2), ('c', 3)]:
+        queue.push(name, priority)
+    consumer.join()
+    print('thread-safe:', results)
+
+async def async_demo():
+    queue = AsyncIndexedPriorityQueue()
+    consumer = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+    queue.push('first', 1)
+    print('asyncio:', await consumer)
+
+thread_demo()
+asyncio.run(async_demo())
+
+# Benchmark: reprioritize 100 of 100_000 queued items, against the plain PriorityQueue with a
+# search + heapify() on every change.
+import random
+import time
+
+n, changes = 100_000, 100
+priorities = [random.random() for _ in range(n)]
+targets = [random.randrange(n) for _ in range(changes)]
+
+plain = PriorityQueue()
+for i, priority in enumerate(priorities):
+    plain.push(i, priority)
+start = time.perf_counter()
+for target in targets:
+    pos = next(i for i, entry in enumerate(plain._queue) if entry[-1] == target)
+    plain._queue[pos] = (-random.random(), plain._queue[pos][1], target)
+    heapq.heapify(plain._queue)
+print(f'rebuild on change: {(time.perf_counter() - start) / changes * 1e6:10.1f}us per change')
+
+indexed = IndexedPriorityQueue()
+handles = [indexed.push(i, priority) for i, priority in enumerate(priorities)]
+start = time.perf_counter()
+for target in targets:
+    indexed.update_priority(handles[target], random.random())
+print(f'indexed update:    {(time.perf_counter() - start) / changes * 1e6:10.1f}us per change')
@@ -41,6 +41,162 @@ print(f"Combine counts: {c}\n")
 # subtract counts
 d = a - b
 print(f"Subtract counts: {d}\n")
+
+"""
+1.12.1 Approximate counting when the vocabulary doesn't fit in memory
+
+Problem: a Counter keeps an exact count for every distinct item. Over a big enough corpus the
+         long tail of rare tokens alone no longer fits in memory, even though you only want
+         the most common ones.
+
+Solution: combine two streaming summaries. A Count-Min Sketch is a small fixed-size table of
+          counters with several hash rows: every item increments one counter per row, and its
+          count is estimated by the smallest of them. That estimate never undercounts and, with
+          width = e/epsilon and depth = ln(1/delta), overcounts by more than epsilon * total
+          with probability at most delta. Next to the sketch, a Space-Saving style table keeps
+          the `capacity` items with the highest estimates seen so far, and most_common() reads
+          from it. The hashes are derived from blake2b instead of hash(), so sketches built in
+          different processes line up and can be added together or serialized. That needs a
+          stable encoding of each item, so items are limited to strings, bytes, numbers and
+          tuples of them (anything else raises TypeError); the same repr() that is hashed is
+          what gets serialized for the top table, and ast.literal_eval() reads it back.
+"""
+
+import json
+from ast import literal_eval
+import math
+import struct
+from array import array
+from hashlib import blake2b
+
+_LITERAL_TYPES = (str, bytes, int, float, type(None))
+
+def _stable_bytes(item):
+    if isinstance(item, str):
+        return item.encode()
+    if isinstance(item, tuple):
+        for part in item:
+            _stable_bytes(part)
+    elif not isinstance(item, _LITERAL_TYPES):
+        raise TypeError(f'HeavyHitters can only count str, bytes, numbers and tuples of them, '
+                        f'not {type(item).__name__}')
+    return repr(item).encode()
+
+class HeavyHitters(object):
+    def __init__(self, epsilon=0.0001, delta=0.001, capacity=100, iterable=None) -> None:
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.capacity = capacity
+        self.total = 0
+        self._rows = [array('q', bytes(8 * self.width)) for _ in range(self.depth)]
+        self._top = {}         # item -> estimated count, for the current heavy hitters
+        self._floor = 0        # lower bound of the smallest count in _top
+        if iterable is not None:
+            self.update(iterable)
+
+    def _indexes(self, item):
+        h = int.from_bytes(blake2b(_stable_bytes(item), digest_size=16).digest(), 'little')
+        h1, h2 = h & 0xFFFFFFFFFFFFFFFF, (h >> 64) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def _estimate(self, indexes):
+        return min(row[i] for row, i in zip(self._rows, indexes))
+
+    def __getitem__(self, item):
+        return self._estimate(self._indexes(item))
+
+    def add(self, item, count=1):
+        indexes = self._indexes(item)
+        for row, i in zip(self._rows, indexes):
+            row[i] += count
+        self.total += count
+        estimate = self._estimate(indexes)
+        top = self._top
+        if item in top or len(top) < self.capacity:
+            top[item] = estimate
+        elif estimate > self._floor:
+            weakest = min(top, key=top.get)
+            if estimate > top[weakest]:
+                del top[weakest]
+                top[item] = estimate
+            self._floor = min(top.values())
+
+    def update(self, iterable):
+        if hasattr(iterable, 'items'):
+            for item, count in iterable.items():
+                self.add(item, count)
+        else:
+            add = self.add
+            for item in iterable:
+                add(item)
+
+    def most_common(self, n=None):
+        ranked = sorted(self._top.items(), key=lambda pair: pair[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def __add__(self, other):
+        if (self.width, self.depth, self.capacity) != (other.width, other.depth, other.capacity):
+            raise ValueError('can only add sketches with the same dimensions')
+        result = HeavyHitters.__new__(HeavyHitters)
+        result.width, result.depth, result.capacity = self.width, self.depth, self.capacity
+        result.total = self.total + other.total
+        result._rows = [array('q', map(sum, zip(a, b))) for a, b in zip(self._rows, other._rows)]
+        candidates = {item: result[item] for item in {**self._top, **other._top}}
+        ranked = sorted(candidates.items(), key=lambda pair: pair[1], reverse=True)
+        result._top = dict(ranked[:result.capacity])
+        result._floor = min(result._top.values(), default=0)
+        return result
+
+    def to_bytes(self):
+        header = struct.pack('<IIIq', self.width, self.depth, self.capacity, self.total)
+        top = json.dumps([(repr(item), count) for item, count in self._top.items()]).encode()
+        return header + b''.join(row.tobytes() for row in self._rows) + top
+
+    @classmethod
+    def from_bytes(cls, data):
+        result = cls.__new__(cls)
+        result.width, result.depth, result.capacity, result.total = struct.unpack_from('<IIIq', data)
+        offset = struct.calcsize('<IIIq')
+        result._rows = []
+        for _ in range(result.depth):
+            row = array('q')
+            row.frombytes(data[offset:offset + 8 * result.width])
+            result._rows.append(row)
+            offset += 8 * result.width
+        result._top = {literal_eval(item): count for item, count in json.loads(data[offset:].decode())}
+        result._floor = min(result._top.values(), default=0)
+        return result
+
+hh = HeavyHitters(epsilon=0.01, delta=0.01, capacity=5, iterable=words)
+print(f"Approximate top 3: {hh.most_common(3)}")
+both = HeavyHitters.from_bytes(hh.to_bytes()) + HeavyHitters(0.01, 0.01, 5, morewords)
+print(f"Approximate combined top 3: {both.most_common(3)}\n")
+
+# Validation against an exact Counter on a generated corpus with a Zipf-like long tail, built in
+# two shards that are merged through the serialized form.
+import random
+import sys
+
+vocabulary = [f'word{i}' for i in range(200_000)]
+weights = [1 / (rank + 1) ** 1.1 for rank in range(len(vocabulary))]
+corpus = random.choices(vocabulary, weights, k=400_000)
+
+exact = Counter(corpus)
+exact_memory = sys.getsizeof(exact) + sum(map(sys.getsizeof, exact))
+
+half = len(corpus) // 2
+shards = [HeavyHitters(epsilon=0.0005, delta=0.01, capacity=50, iterable=corpus[:half]),
+          HeavyHitters(epsilon=0.0005, delta=0.01, capacity=50, iterable=corpus[half:])]
+approx = HeavyHitters.from_bytes(shards[0].to_bytes()) + HeavyHitters.from_bytes(shards[1].to_bytes())
+sketch_memory = len(approx.to_bytes())
+
+exact_top = [item for item, _ in exact.most_common(20)]
+approx_top = [item for item, _ in approx.most_common(20)]
+worst = max(approx[item] - exact[item] for item in exact_top)
+print(f"top-20 overlap: {len(set(exact_top) & set(approx_top))}/20, "
+      f"worst overcount {worst} (bound {0.0005 * len(corpus):.0f})")
+print(f"memory: Counter {exact_memory / 1024:.0f} KiB for {len(exact)} words, "
+      f"serialized sketch {sketch_memory / 1024:.0f} KiB")
 print("- " * 50)
 # =======================================================================================
 
@@ -103,3 +103,431 @@ pylines = gen_grep('(?i)python', lines)
 bytecolumn = (line.rsplit(None, 1)[1] for line in pylines)
 bytes = (int(x) for x in bytecolumn if x != '-')
 print('Total: ', sum(bytes))
+print()
+# =======================================================================================
+
+"""
+4.13.1 Running the pipeline on several cores
+
+Problem: the pipeline above is strictly serial: one process finds, opens, decompresses and
+         greps every file in turn, so a directory of big .gz/.bz2 logs keeps one core busy
+         while the others sit idle.
+
+Solution: the stages don't depend on each other across files, so the same stages can run in
+          a pool of processes, one task per file. An uncompressed file can also be split into
+          byte ranges that end on a newline, so that several workers share it. Each task
+          reduces its own lines to a partial aggregate (like the bytecolumn sum), and only
+          those small results travel back to be merged. Results come back in task order if
+          asked, otherwise as soon as each task finishes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+def gen_range_lines(filename, start, end):
+    """
+    Produce the decoded lines that start inside [start, end) of an uncompressed file
+    """
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            yield line.decode('utf-8')
+
+
+def file_tasks(filenames, split_size=None):
+    """
+    Turn filenames into (filename, start, end) tasks. Compressed files can't be split,
+    so they always make a single task with start and end set to None.
+    """
+    for filename in filenames:
+        if filename.endswith(('.gz', '.bz2')) or not split_size:
+            yield filename, None, None
+            continue
+        size = os.path.getsize(filename)
+        start = 0
+        with open(filename, 'rb') as f:
+            while start < size:
+                f.seek(min(start + split_size, size))
+                f.readline()          # move the boundary to just after a newline
+                end = min(f.tell(), size)
+                yield filename, start, end
+                start = end
+
+
+def run_task(stage, task):
+    filename, start, end = task
+    if start is None:
+        files = gen_opener([filename])
+        return stage(gen_concatenate(files))
+    return stage(gen_range_lines(filename, start, end))
+
+
+def gen_parallel(stage, filenames, split_size=None, ordered=False, executor=None):
+    """
+    Run stage(lines) for every file (or byte range) in a process pool, and produce
+    the partial results
+    """
+    tasks = list(file_tasks(filenames, split_size))
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor()
+    try:
+        job = partial(run_task, stage)
+        if ordered:
+            yield from executor.map(job, tasks)
+        else:
+            futures = [executor.submit(job, task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def python_bytes(lines, pattern='(?i)python'):
+    pylines = gen_grep(pattern, lines)
+    bytecolumn = (line.rsplit(None, 1)[1] for line in pylines)
+    return sum(int(x) for x in bytecolumn if x != '-')
+
+
+"""
+4.13.2 Grepping for hundreds of patterns in one pass
+
+Problem: gen_grep() runs one regex per line on decoded text. Looking for hundreds of patterns
+         means hundreds of stages (or passes), each of them decoding and searching every line.
+
+Solution: merge all of the literal strings into one Aho-Corasick automaton, a trie whose failure
+          links let a single scan over each line find every occurrence of every literal. Regular
+          expressions are handled through the same automaton: each regex contributes the longest
+          literal it can't match without, and the regex only runs on lines where that literal was
+          found. Everything stays in bytes, and each matching line is reported together with the
+          names of the patterns that matched it.
+"""
+
+from collections import deque
+
+class AhoCorasick:
+    def __init__(self, keywords):
+        goto, fail, out = [{}], [0], [set()]
+        for keyword in keywords:
+            state = 0
+            for byte in keyword:
+                if byte not in goto[state]:
+                    goto.append({})
+                    fail.append(0)
+                    out.append(set())
+                    goto[state][byte] = len(goto) - 1
+                state = goto[state][byte]
+            out[state].add(keyword)
+
+        # breadth first, so the failure target of a state is finished before the state itself
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for byte, child in goto[state].items():
+                queue.append(child)
+                target = fail[state]
+                while target and byte not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target].get(byte, 0)
+                out[child] |= out[fail[child]]
+
+        # fold the failure links into a complete transition table so scanning never backtracks
+        delta = [dict(goto[0])]
+        for state in range(1, len(goto)):
+            delta.append({})
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            table = dict(delta[fail[state]])
+            table.update(goto[state])
+            delta[state] = table
+            queue.extend(goto[state].values())
+        self.delta = delta
+        self.out = [frozenset(o) for o in out]
+
+    def find_all(self, data):
+        """
+        Return the set of keywords that occur anywhere in data
+        """
+        delta, out = self.delta, self.out
+        state, found = 0, set()
+        for byte in data:
+            state = delta[state].get(byte, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+_REGEX_SPECIAL = set(b'.^$*+?{}[]|()\\')
+
+def _class_end(pattern, i):
+    # index just past the ']' that closes the character class opened at pattern[i]
+    i += 1
+    if i < len(pattern) and pattern[i] == ord('^'):
+        i += 1
+    if i < len(pattern) and pattern[i] == ord(']'):
+        i += 1
+    while i < len(pattern) and pattern[i] != ord(']'):
+        i += 2 if pattern[i] == ord('\\') else 1
+    return i + 1
+
+def _group_end(pattern, i):
+    # index just past the ')' that closes the group opened at pattern[i]
+    depth = 0
+    while i < len(pattern):
+        if pattern[i] == ord('\\'):
+            i += 2
+            continue
+        if pattern[i] == ord('['):
+            i = _class_end(pattern, i)
+            continue
+        if pattern[i] == ord('('):
+            depth += 1
+        elif pattern[i] == ord(')'):
+            depth -= 1
+            if not depth:
+                return i + 1
+        i += 1
+    return i
+
+def required_literal(pattern):
+    """
+    Return the longest plain run of bytes that every match of a regex must contain, or
+    None when the pattern is too clever for this simple check
+    """
+    if b'|' in pattern or b'(?' in pattern:
+        return None
+    best, start, i = b'', 0, 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c not in _REGEX_SPECIAL:
+            i += 1
+            continue
+        end = i - 1 if c in b'?*{' else i    # the character before is optional
+        if end - start > len(best):
+            best = pattern[start:end]
+        if c == ord('\\'):
+            # \xhh, \uXXXX, \N{...}, octal codes and group references run past two characters
+            if pattern[i + 1:i + 2] in (b'x', b'u', b'U', b'N') or pattern[i + 1:i + 2].isdigit():
+                return None
+            i += 2
+        elif c == ord('['):                 # a class matches one of its characters, not all
+            i = _class_end(pattern, i)
+        elif c == ord('{'):                 # repeat counts are not text
+            i = pattern.find(b'}', i) + 1 or len(pattern)
+        elif c == ord('('):
+            stop = _group_end(pattern, i)
+            if stop >= len(pattern) or pattern[stop] not in b'?*{':
+                inner = required_literal(pattern[i + 1:stop - 1])
+                if inner is not None and len(inner) > len(best):
+                    best = inner
+            i = stop
+        else:
+            i += 1
+        start = i
+    if len(pattern) - start > len(best):
+        best = pattern[start:]
+    return best or None
+
+
+class MultiGrep:
+    def __init__(self, literals=(), regexes=(), ignore_case=False):
+        self.ignore_case = ignore_case
+        fold = (lambda b: b.lower()) if ignore_case else (lambda b: b)
+        self.literals = {fold(literal): literal for literal in literals}
+        self.regexes = {}           # prefilter literal -> [(name, compiled regex)]
+        self.unfiltered = []        # regexes without a usable literal
+        flags = re.IGNORECASE if ignore_case else 0
+        for pattern in regexes:
+            literal = required_literal(pattern)
+            compiled = re.compile(pattern, flags)
+            if literal is None:
+                self.unfiltered.append((pattern, compiled))
+            else:
+                self.regexes.setdefault(fold(literal), []).append((pattern, compiled))
+        self.automaton = AhoCorasick(set(self.literals) | set(self.regexes))
+
+    def match(self, line):
+        found = self.automaton.find_all(line.lower() if self.ignore_case else line)
+        names = {self.literals[key] for key in found if key in self.literals}
+        for key in found:
+            for name, regex in self.regexes.get(key, ()):
+                if regex.search(line):
+                    names.add(name)
+        for name, regex in self.unfiltered:
+            if regex.search(line):
+                names.add(name)
+        return names
+
+
+def gen_multigrep(matcher, lines):
+    """
+    Produce (line, names of matching patterns) for every line of bytes that matches
+    """
+    for line in lines:
+        names = matcher.match(line)
+        if names:
+            yield line, names
+
+
+"""
+4.13.3 Decompressing ahead of the consumer
+
+Problem: gen_opener() opens .gz/.bz2 files in text mode, so the consuming thread pays for the
+         decompression, the UTF-8 decoding and the line splitting of every line, one at a time.
+
+Solution: move decompression to a background thread that reads the files in large binary blocks
+          and hands them over through a bounded queue. zlib and bz2 release the GIL while they
+          work, so the next blocks are being decompressed while the current ones are consumed.
+          The consumer splits each block into lines with one bytes.split() call and yields them
+          as bytes, without their trailing newline. A line is never carried over from the end of
+          one file to the start of the next.
+"""
+
+import queue
+import threading
+
+_END_OF_FILE = object()
+_DONE = object()
+
+def _open_binary(filename):
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rb')
+    elif filename.endswith('.bz2'):
+        return bz2.open(filename, 'rb')
+    return open(filename, 'rb')
+
+
+def _put(blocks, item, stop):
+    # block on a full queue only in short waits, so that a consumer that has gone away
+    # (and set `stop`) never leaves this thread stuck forever
+    while not stop.is_set():
+        try:
+            blocks.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _prefetch(filenames, blocks, block_size, stop):
+    try:
+        for filename in filenames:
+            with _open_binary(filename) as f:
+                for block in iter(partial(f.read, block_size), b''):
+                    if not _put(blocks, block, stop):
+                        return
+            if not _put(blocks, _END_OF_FILE, stop):
+                return
+        _put(blocks, _DONE, stop)
+    except BaseException as e:
+        _put(blocks, e, stop)
+
+
+def gen_prefetch_lines(filenames, block_size=1 << 20, depth=8):
+    """
+    Produce the lines (as bytes, without newlines) of a sequence of possibly
+    compressed files, decompressing up to `depth` blocks ahead in a background thread
+    """
+    blocks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    worker = threading.Thread(target=_prefetch, args=(filenames, blocks, block_size, stop), daemon=True)
+    worker.start()
+    try:
+        rest = b''
+        while True:
+            block = blocks.get()
+            if block is _DONE:
+                break
+            if isinstance(block, BaseException):
+                raise block
+            if block is _END_OF_FILE:
+                if rest:
+                    yield rest
+                rest = b''
+                continue
+            lines = (rest + block).split(b'\n')
+            rest = lines.pop()
+            yield from lines
+    finally:
+        # also runs on close(), break or an exception in the consumer: stop the worker,
+        # free any queued blocks and wait for it to close its file
+        stop.set()
+        while True:
+            try:
+                blocks.get_nowait()
+            except queue.Empty:
+                break
+        worker.join()
+
+
+if __name__ == '__main__':
+    import random
+    import tempfile
+    import time
+
+    agents = ['Mozilla/5.0', 'python-requests/2.31', 'curl/8.0', 'Python-urllib/3.11']
+    with tempfile.TemporaryDirectory() as top:
+        for i, opener in enumerate([open, gzip.open, bz2.open] * 2):
+            suffix = {open: '', gzip.open: '.gz', bz2.open: '.bz2'}[opener]
+            with opener(os.path.join(top, f'access-log-{i}{suffix}'), 'wt') as f:
+                for n in range(200_000):
+                    size = random.choice(['-', str(random.randrange(100, 20_000))])
+                    f.write(f'10.0.0.{n % 256} - - "GET /page/{n} HTTP/1.1" 200 '
+                            f'"{random.choice(agents)}" {size}\n')
+
+        start = time.perf_counter()
+        lines = gen_concatenate(gen_opener(gen_find('access-log*', top)))
+        print('serial total:   ', python_bytes(lines), f'{time.perf_counter() - start:.2f}s')
+
+        start = time.perf_counter()
+        partials = gen_parallel(python_bytes, gen_find('access-log*', top), split_size=4 << 20)
+        print('parallel total: ', sum(partials), f'{time.perf_counter() - start:.2f}s')
+
+        # one pass with a combined automaton, against a separate gen_grep pass per pattern
+        patterns = [f'/page/{n}7 '.encode() for n in range(200)] + [b'python-requests/2\\.\\d+', b'curl/8']
+        with open(os.path.join(top, 'access-log-0'), 'rb') as f:
+            raw_lines = f.readlines()[:50_000]
+        matcher = MultiGrep(literals=patterns[:-2], regexes=patterns[-2:])
+
+        # the prefilter literal must never hide a line the regex itself would match
+        for regex, line in [(b'[xyz]+foo', b'xfoo'), (b'(abc)?def', b'def'), (b'x{10,20}', b'x' * 12),
+                            (b'(ab)+c', b'ababc'), (b'a[]b]*c', b'a]]c'),
+                            (rb'\x41BC', b'xxABCxx'), (rb'\101BC', b'xxABCxx'),
+                            (rb'(a)\1bc', b'aabc'), (b'python-requests/2\\.\\d+', raw_lines[0])]:
+            assert (regex in MultiGrep(regexes=[regex]).match(line)) == bool(re.search(regex, line)), regex
+
+        start = time.perf_counter()
+        hits = sum(len(names) for _, names in gen_multigrep(matcher, raw_lines))
+        print(f'multigrep:          {hits} hits, {time.perf_counter() - start:.2f}s')
+
+        start = time.perf_counter()
+        text_lines = [line.decode() for line in raw_lines]
+        hits = sum(sum(1 for _ in gen_grep(re.escape(p.decode()) if i < 200 else p.decode(), text_lines))
+                   for i, p in enumerate(patterns))
+        print(f'{len(patterns)} gen_grep passes: {hits} hits, {time.perf_counter() - start:.2f}s')
+
+        # compressed logs through the text-mode opener, against the prefetching bytes reader
+        compressed = sorted(gen_find('access-log-*.*', top))
+        total_size = 0
+        for name in compressed:
+            with _open_binary(name) as f:
+                total_size += sum(len(block) for block in iter(partial(f.read, 1 << 20), b''))
+
+        start = time.perf_counter()
+        count = sum(1 for _ in gen_grep('(?i)python', gen_concatenate(gen_opener(compressed))))
+        elapsed = time.perf_counter() - start
+        print(f"'rt' opener:     {count} lines, {total_size / elapsed / 1e6:.1f} MB/s")
+
+        start = time.perf_counter()
+        pattern = re.compile(b'(?i)python')
+        count = sum(1 for line in gen_prefetch_lines(compressed) if pattern.search(line))
+        elapsed = time.perf_counter() - start
+        print(f'prefetch bytes:  {count} lines, {total_size / elapsed / 1e6:.1f} MB/s')
+        # most of the gain comes from decompressing on another core; on a single-core machine
+        # the two numbers stay close, because bz2 decompression dominates either way
@@ -48,6 +48,219 @@ print(list(items))
 items.add(-10)
 print(list(items))
 
+# SortedItems keeps everything in one list, so every add() pays for a memmove of on average
+# half the list, and there is no way to ask for a range of values. The same Sequence interface
+# can sit on top of many short sorted sublists instead. A bisect over the maximum of each sublist
+# finds the right sublist, and a Fenwick tree (binary indexed tree) over the sublist lengths turns
+# a global index into (sublist, offset) and back in O(log n). That gives fast positional access
+# for __getitem__, bisect and irange. The tree is rebuilt lazily after a sublist is split or removed.
+
+from heapq import merge
+from itertools import islice
+
+class ChunkedSortedItems(Sequence):
+    def __init__(self, initial=None, load=1000) -> None:
+        self._load = load
+        self._lists = []
+        self._maxes = []
+        self._len = 0
+        self._tree = None
+        if initial:
+            self._rebuild(sorted(initial))
+
+    def _rebuild(self, values):
+        load = self._load
+        self._lists = [values[i:i + load] for i in range(0, len(values), load)]
+        self._maxes = [sublist[-1] for sublist in self._lists]
+        self._len = len(values)
+        self._tree = None
+
+    # Fenwick tree over the sublist lengths
+    def _index(self):
+        if self._tree is None:
+            tree = [0] + [len(sublist) for sublist in self._lists]
+            size = len(self._lists)
+            for i in range(1, size + 1):
+                j = i + (i & -i)
+                if j <= size:
+                    tree[j] += tree[i]
+            self._tree = tree
+        return self._tree
+
+    def _grow(self, pos, delta):
+        if self._tree is not None:
+            tree, i, size = self._tree, pos + 1, len(self._lists)
+            while i <= size:
+                tree[i] += delta
+                i += i & -i
+
+    def _offset(self, pos):
+        # number of items in the sublists before position pos
+        tree, total, i = self._index(), 0, pos
+        while i:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index):
+        tree, pos = self._index(), 0
+        bit = 1 << (len(self._lists).bit_length() - 1) if self._lists else 0
+        while bit:
+            nxt = pos + bit
+            if nxt < len(tree) and tree[nxt] <= index:
+                pos = nxt
+                index -= tree[nxt]
+            bit >>= 1
+        return pos, index
+
+    # required sequence methods
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('index out of range')
+        pos, offset = self._locate(index)
+        return self._lists[pos][offset]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        for sublist in self._lists:
+            yield from sublist
+
+    def __contains__(self, item):
+        pos = bisect.bisect_left(self._maxes, item)
+        if pos == len(self._maxes):
+            return False
+        sublist = self._lists[pos]
+        return sublist[bisect.bisect_left(sublist, item)] == item
+
+    def index(self, item, start=0, stop=None):
+        # same contract as list.index: the first equal item at or after start, before stop
+        start, stop, _ = slice(start, stop).indices(self._len)
+        i = max(start, self.bisect_left(item))
+        if i < stop and self[i] == item:
+            return i
+        raise ValueError(f'{item!r} is not in sequence')
+
+    def count(self, item):
+        return self.bisect_right(item) - self.bisect_left(item)
+
+    def bisect_left(self, item):
+        pos = bisect.bisect_left(self._maxes, item)
+        if pos == len(self._maxes):
+            return self._len
+        return self._offset(pos) + bisect.bisect_left(self._lists[pos], item)
+
+    def bisect_right(self, item):
+        pos = bisect.bisect_right(self._maxes, item)
+        if pos == len(self._maxes):
+            return self._len
+        return self._offset(pos) + bisect.bisect_right(self._lists[pos], item)
+
+    bisect = bisect_right
+
+    def irange(self, lo, hi, inclusive=(True, True)):
+        start = self.bisect_left(lo) if inclusive[0] else self.bisect_right(lo)
+        stop = self.bisect_right(hi) if inclusive[1] else self.bisect_left(hi)
+        if start >= stop:
+            return
+        pos, offset = self._locate(start)
+        remaining = stop - start
+        for sublist in islice(self._lists, pos, None):
+            chunk = sublist[offset:offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            if not remaining:
+                return
+            offset = 0
+
+    def add(self, item):
+        if not self._lists:
+            self._rebuild([item])
+            return
+        pos = bisect.bisect_right(self._maxes, item)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._lists[pos].append(item)
+            self._maxes[pos] = item
+        else:
+            bisect.insort(self._lists[pos], item)
+        self._len += 1
+        self._grow(pos, 1)
+        if len(self._lists[pos]) > 2 * self._load:
+            sublist = self._lists[pos]
+            half = sublist[self._load:]
+            del sublist[self._load:]
+            self._lists.insert(pos + 1, half)
+            self._maxes[pos] = sublist[-1]
+            self._maxes.insert(pos + 1, half[-1])
+            self._tree = None
+
+    def remove(self, item):
+        pos = bisect.bisect_left(self._maxes, item)
+        if pos < len(self._maxes):
+            sublist = self._lists[pos]
+            i = bisect.bisect_left(sublist, item)
+            if sublist[i] == item:
+                del sublist[i]
+                self._len -= 1
+                if sublist:
+                    self._maxes[pos] = sublist[-1]
+                    self._grow(pos, -1)
+                else:
+                    del self._lists[pos]
+                    del self._maxes[pos]
+                    self._tree = None
+                return
+        raise ValueError(f'{item!r} is not in sequence')
+
+    def update(self, items, presorted=False):
+        items = list(items) if presorted else sorted(items)
+        if len(items) * 8 < self._len:
+            for item in items:
+                self.add(item)
+        else:
+            # a big batch is cheaper to merge in one linear pass and re-chunk
+            self._rebuild(list(merge(self, items)))
+
+items = ChunkedSortedItems([5, 1, 3], load=2)
+items.update(range(10, 0, -2))
+items.add(-10)
+items.remove(3)
+print(list(items), items[0], items[-1], items[3:6])
+print(list(items.irange(2, 8)), items.bisect(4), items.count(6), 6 in items)
+
+# Benchmark: single adds against SortedItems, then range and k-th element queries at a larger
+# size. Raise big_size towards 100_000_000 for the full-scale run (that needs several GB of memory).
+import random
+import time
+
+values = [random.random() for _ in range(100_000)]
+for cls in (SortedItems, ChunkedSortedItems):
+    container = cls()
+    start = time.perf_counter()
+    for value in values:
+        container.add(value)
+    print(f'{cls.__name__:>18}: {len(values)} adds in {time.perf_counter() - start:.3f}s')
+
+big_size = 1_000_000
+big = ChunkedSortedItems()
+start = time.perf_counter()
+for batch in range(10):
+    big.update(random.random() for _ in range(big_size // 10))
+print(f'update with {big_size} items in batches: {time.perf_counter() - start:.3f}s')
+
+start = time.perf_counter()
+for _ in range(10_000):
+    lo = random.random()
+    sum(1 for _ in big.irange(lo, lo + 1e-5))
+    big[random.randrange(len(big))]
+print(f'10000 irange + k-th queries: {time.perf_counter() - start:.3f}s')
+
 """
 Many of the abstract base classes in collections also provide default implementations
 of common container methods. To illustrate, suppose you have a class that inherits from
@@ -84,13 +84,14 @@ Solution: Once of the most straightforward ways to write a new context manager i
 import time
 from contextlib import contextmanager
 
+# profiled_block() in script_7 is the same idea, recording into a shared registry
 @contextmanager
 def timethis(label):
-    start = time.time()
+    start = time.perf_counter()
     try:
         yield
     finally:
-        end = time.time()
+        end = time.perf_counter()
         print(f"{label}: {end-start}")
 
 with timethis("counting"):
@@ -79,3 +79,93 @@ def spam(x, y, z=42):
 spam(1, 2, 3)
 spam(1, "Hello", 3)
 # spam(1, "h", "w") # will throw error
+print(f"{'-'*50}")
+print()
+# =======================================================================================
+
+"""
+9.7.1 Compiling the type checks at decoration time
+
+Problem: typeassert() above calls sig.bind() and walks bound_values.arguments on every
+         single call. For small functions that costs several times more than the
+         function itself.
+
+Solution: do all of the signature work once, when the decorator is applied. Positional
+          parameters map to fixed indexes in args, so the checks can be written out as
+          plain source code and compiled with exec(). Keyword arguments fall back to a
+          dictionary lookup. A sample=N option checks only every Nth call, which is
+          often good enough in production.
+"""
+
+from inspect import signature, Parameter
+from functools import wraps
+from itertools import count
+
+def typeassert_fast(*ty_args, sample=1, **ty_kwargs):
+    def decorate(func):
+        # if in optimized mode, disable type checking.
+        if not __debug__:
+            return func
+
+        sig = signature(func)
+        bound_types = sig.bind_partial(*ty_args, **ty_kwargs).arguments
+
+        # types for *args / **kwargs apply to the whole tuple or dict, which can't be
+        # checked by index. Use the original decorator for those.
+        for name in bound_types:
+            if sig.parameters[name].kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+                return typeassert(*ty_args, **ty_kwargs)(func)
+
+        namespace = {'_func': func, '_counter': count(), '_sample': sample}
+        lines = ['def wrapper(*args, **kwargs):']
+        if sample > 1:
+            lines.append('    if next(_counter) % _sample:')
+            lines.append('        return _func(*args, **kwargs)')
+        lines.append('    nargs = len(args)')
+
+        kw_types = {}
+        for index, param in enumerate(sig.parameters.values()):
+            if param.name not in bound_types:
+                continue
+            if param.kind != Parameter.KEYWORD_ONLY:
+                namespace[f'_t{index}'] = bound_types[param.name]
+                lines.append(f'    if nargs > {index} and not isinstance(args[{index}], _t{index}):')
+                lines.append(f'        raise TypeError(f"Argument {param.name} must be {{_t{index}}}")')
+            if param.kind != Parameter.POSITIONAL_ONLY:
+                kw_types[param.name] = bound_types[param.name]
+
+        namespace['_kw_types'] = kw_types
+        if kw_types:
+            lines.append('    if kwargs:')
+            lines.append('        for name, value in kwargs.items():')
+            lines.append('            expected = _kw_types.get(name)')
+            lines.append('            if expected is not None and not isinstance(value, expected):')
+            lines.append('                raise TypeError(f"Argument {name} must be {expected}")')
+        lines.append('    return _func(*args, **kwargs)')
+
+        exec('\n'.join(lines), namespace)
+        return wraps(func)(namespace['wrapper'])
+    return decorate
+
+@typeassert_fast(int, z=int)
+def spam(x, y, z=42):
+    print(x, y, z)
+
+spam(1, 2, 3)
+spam(1, "Hello", z=3)
+# spam(1, "h", "w")   # will throw error
+# spam(1, "h", z="w") # so will this, through the keyword fallback
+
+# comparing the cost of both versions on a tiny function
+from timeit import timeit
+
+def add(x, y):
+    return x + y
+
+checked_add = typeassert(int, int)(add)
+fast_add    = typeassert_fast(int, int)(add)
+sampled_add = typeassert_fast(int, int, sample=100)(add)
+
+for label, f in [('plain', add), ('typeassert', checked_add),
+                 ('typeassert_fast', fast_add), ('sample=100', sampled_add)]:
+    print(f"{label:>16}: {timeit(lambda: f(2, 3), number=100000):.4f}s")
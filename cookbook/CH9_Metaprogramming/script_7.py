@@ -51,3 +51,158 @@ s.bar(2)
 s.bar(3)
 s.bar(4)
 print(Spam.bar.ncalls)
+print('-' * 50)
+# ===================================================================================
+
+"""
+9.9.1 Turning Profiled into a low-overhead sampling profiler
+
+Problem: Profiled above only counts calls, and the timethis() decorators of 9.1, 9.10
+         and 9.22 print the time.time() difference on every single call. You want real
+         latency numbers for hot functions without paying for them on every call.
+
+Solution: keep the same decorator-as-a-class shape, but record into a shared registry.
+          Each function gets a fixed-bucket latency histogram filled from perf_counter_ns(),
+          and only 1 in every `sample` calls is actually timed. The same registry also
+          takes timings from with-blocks.
+"""
+
+import time
+import types
+from bisect import bisect_right
+from contextlib import contextmanager
+from functools import wraps
+
+# upper bounds of the latency buckets in nanoseconds: 1us, 10us, ... 1s, and beyond
+BUCKETS_NS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000, 1_000_000_000)
+BUCKET_LABELS = ('<1us', '<10us', '<100us', '<1ms', '<10ms', '<100ms', '<1s', '>=1s')
+
+class FunctionStats:
+    __slots__ = ('name', 'ncalls', 'nsampled', 'total_ns', 'histogram')
+
+    def __init__(self, name) -> None:
+        self.name = name
+        self.ncalls = 0
+        self.nsampled = 0
+        self.total_ns = 0
+        self.histogram = [0] * (len(BUCKETS_NS) + 1)
+
+    def record(self, elapsed_ns):
+        self.nsampled += 1
+        self.total_ns += elapsed_ns
+        self.histogram[bisect_right(BUCKETS_NS, elapsed_ns)] += 1
+
+    @property
+    def estimated_total_ns(self):
+        # scale the sampled time up to all of the calls
+        if not self.nsampled:
+            return 0
+        return self.total_ns * self.ncalls // self.nsampled
+
+class ProfileRegistry:
+    def __init__(self) -> None:
+        self.stats = {}
+
+    def get(self, name):
+        if name not in self.stats:
+            self.stats[name] = FunctionStats(name)
+        return self.stats[name]
+
+    def hottest(self, n=10):
+        return sorted(self.stats.values(), key=lambda s: s.estimated_total_ns, reverse=True)[:n]
+
+    def dump(self, n=10):
+        for s in self.hottest(n):
+            mean_us = s.total_ns / s.nsampled / 1000 if s.nsampled else 0
+            buckets = ' '.join(f"{label}:{count}" for label, count in zip(BUCKET_LABELS, s.histogram) if count)
+            print(f"{s.name:<30} calls={s.ncalls:<8} sampled={s.nsampled:<6} "
+                  f"total~{s.estimated_total_ns / 1e6:.3f}ms mean={mean_us:.2f}us  {buckets}")
+
+    def clear(self):
+        self.stats.clear()
+
+registry = ProfileRegistry()
+
+class SampledProfiled:
+    def __init__(self, func, *, sample=1, registry=registry) -> None:
+        wraps(func)(self)
+        self.sample = sample
+        self.stats = registry.get(self.__qualname__)
+
+    def _call(self, func, /, *args, **kwargs):
+        stats = self.stats
+        stats.ncalls += 1
+        if stats.ncalls % self.sample:
+            return func(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.record(time.perf_counter_ns() - start)
+
+    def __call__(self, *args, **kwargs):
+        return self._call(self.__wrapped__, *args, **kwargs)
+
+    def __get__(self, instance, cls):
+        func = self.__wrapped__
+        # applied on top of @classmethod/@staticmethod: let them do the binding
+        if isinstance(func, (classmethod, staticmethod)):
+            return types.MethodType(self._call, func.__get__(instance, cls))
+        if instance is None:
+            return self
+        return types.MethodType(self, instance)
+
+# a decorator that takes optional arguments, as in 9.6
+def profiled(func=None, *, sample=1, registry=registry):
+    if func is None:
+        return lambda f: SampledProfiled(f, sample=sample, registry=registry)
+    return SampledProfiled(func, sample=sample, registry=registry)
+
+@contextmanager
+def profiled_block(label, registry=registry):
+    stats = registry.get(label)
+    stats.ncalls += 1
+    start = time.perf_counter_ns()
+    try:
+        yield stats
+    finally:
+        stats.record(time.perf_counter_ns() - start)
+
+@profiled
+def countdown(n):
+    while n > 0:
+        n -= 1
+
+class Spam:
+    @profiled(sample=10)
+    def instance_method(self, n):
+        return n * 2
+
+    @profiled
+    @classmethod
+    def class_method(cls, n):
+        return cls, n
+
+    @classmethod
+    @profiled
+    def other_class_method(cls, n):
+        return cls, n
+
+    @profiled
+    @staticmethod
+    def static_method(n):
+        return n
+
+countdown(100000)
+countdown(10)
+s = Spam()
+for i in range(1000):
+    s.instance_method(i)
+print(Spam.class_method(1), Spam.other_class_method(2), s.static_method(3))
+
+with profiled_block("counting"):
+    n = 1000000
+    while n > 0:
+        n -= 1
+
+registry.dump()
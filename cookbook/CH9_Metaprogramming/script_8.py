@@ -9,13 +9,14 @@ Solution: applying decorators to class and static method is straightforward, but
 import time
 from functools import wraps
 
+# timed with perf_counter(); the registry-backed profiled() in script_7 handles these method kinds too
 # a simple decorator
 def timethis(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter()
         r = func(*args, **kwargs)
-        end = time.time()
+        end = time.perf_counter()
         print(end-start)
         return r
     return wrapper
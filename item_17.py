@@ -21,20 +21,39 @@ def read_visits(data_path):
     with open(data_path) as f:
         for line in f:
             yield int(line)
+# A small sample file to run the examples against.
+import os
+import tempfile
+
+sample_dir = tempfile.TemporaryDirectory()   # removed once the examples below are done with it
+path = os.path.join(sample_dir.name, 'my_numbers.txt')
+with open(path, 'w') as f:
+    f.write('12\n54\n23\n')
+
 # Surprisingly, calling normalize on the generator's return value produces no results.
-it = read_visits('/tmp/my_numbers.txt')
+it = read_visits(path)
 percentages = normalize(it)
 print(percentages)
 # output = []
 
 # This cause of this behaviour is that an iterator only produces its results a single time. If you iterate over an iterator or generator that has already raised a StopIteration exception, you won't get any results the second time around.
 # what's confusing is that you also won't get any errors when you iterate over an already exhausted iterator.
-it = read_visits('/tmp/my_numbers.txt')
+it = read_visits(path)
 print(list(it)) # [12, 54, 23]
 print(list(it)) # []
 
+# One way to fix this is to accept a function that returns a new iterator each time it's called.
+def normalize_func(get_iter):
+    total  = sum(get_iter())     # new iterator
+    result = []
+    for value in get_iter():     # new iterator
+        percentage = 100 * value / total
+        result.append(percentage)
+    return result
+
 # IMP: To use normalize_func, you can pass in a lambda function that calls the generator and produces a new iterator each time.
 percentages = normalize_func(lambda : read_visits(path))
+print(percentages)
 
 # though it works, having to pass a lambda function like this is clumsy. 
 # The better way to achieve the same result is to provide a new container class 
@@ -56,10 +75,93 @@ class ReadVisits(object):
 visits = ReadVisits(path)
 percentages = normalize(visits)
 print(percentages)
+sample_dir.cleanup()
 
 # This works because the sum method in normalize will call ReadVisits.__iter__ to allocate a new iterator objects. The for loop to normalize the numbers will also call __iter_ to allocate a second iterator ojects.
 # Each of those iterators will be advanced an dexhausted independently, ensuring that each unique iteration sees all of the input dta values. The only downside of this approach is that it reads the input data multiple times.
 
+# For really big files, reading and parsing the text twice is the expensive part, and a list of every value may not even fit in memory.
+# A better approach is to parse the file once, in large byte chunks, into a compact binary cache of 64-bit integers. The total is
+# computed during that same pass, so normalizing only has to stream over the cache once. int() accepts bytes directly, so each chunk
+# can be parsed with a single bytes.split() and map() instead of a Python-level loop over decoded lines.
+# The cache is memory-mapped when read back, so files larger than RAM are processed one window at a time.
+import mmap
+import os
+from array import array
+
+class VisitCache(object):
+    def __init__(self, data_path, cache_path=None, chunk_size=1 << 20):
+        self.data_path  = data_path
+        self.cache_path = cache_path or data_path + '.q'
+        self.chunk_size = chunk_size
+        self.total, self.count = self._build()
+
+    def _build(self):
+        total, count, rest = 0, 0, b''
+        with open(self.data_path, 'rb') as src, open(self.cache_path, 'wb') as dst:
+            while True:
+                chunk = src.read(self.chunk_size)
+                if not chunk:
+                    break
+                # keep a partial trailing line for the next chunk
+                chunk, _, next_rest = (rest + chunk).rpartition(b'\n')
+                rest = next_rest
+                values = array('q', map(int, chunk.split()))
+                values.tofile(dst)
+                total += sum(values)
+                count += len(values)
+            if rest.strip():
+                values = array('q', map(int, rest.split()))
+                values.tofile(dst)
+                total += sum(values)
+                count += len(values)
+        return total, count
+
+    def chunks(self):
+        if not self.count:
+            return
+        # whole 8-byte values per window: round the chunk size up to a multiple of 8
+        step = max(8, (self.chunk_size + 7) // 8 * 8)
+        with open(self.cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            for start in range(0, len(m), step):
+                values = array('q')
+                values.frombytes(m[start:start + step])
+                yield values
+
+    def __iter__(self):
+        # still a container, so the original normalize works with it too
+        for chunk in self.chunks():
+            yield from chunk
+
+def normalize_stream(cache):
+    total = cache.total
+    for chunk in cache.chunks():
+        yield array('d', [100 * value / total for value in chunk])
+
+import random
+import tempfile
+import time
+
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, 'visits.txt')
+    with open(path, 'w') as f:
+        f.writelines(f'{random.randrange(1, 100)}\n' for _ in range(1_000_000))
+
+    start = time.perf_counter()
+    expected = normalize(ReadVisits(path))
+    print(f'normalize(ReadVisits): {time.perf_counter() - start:.3f}s')
+
+    start = time.perf_counter()
+    cache = VisitCache(path)
+    result = array('d')
+    for percentages in normalize_stream(cache):
+        result.extend(percentages)
+    print(f'VisitCache + stream:   {time.perf_counter() - start:.3f}s')
+    assert list(result) == expected
+
+    tiny = VisitCache(path, chunk_size=3)
+    assert list(tiny) == list(ReadVisits(path)) and len(next(tiny.chunks())) == 1
+
 # Notes:
 # -> Beware of functions that iterate over input arguments multiple times. If these arguments are iterators, you may see strange behavior and missing values.
 # -> Python iterator protocol defines how containers an iterators interact with the iter and next built-in functions, for loops, and related expressions.
@@ -135,6 +135,7 @@ class Subject(object):
         for grade in self.grade:
             total += grade.score * grade.weight
             total_weight += grade.weight
+        return total / total_weight
 # Then you would write a class to represent a set of subjects that are being studied by a single student.
 class Student(object):
     def __init__(self):
@@ -169,6 +170,116 @@ math.report_grade(80, 0.10)
 
 print(albert.average_grade())
 
+# Every average_grade call above walks all of the grades again, and Student.average_grade walks every subject on top of that.
+# That's fine for a handful of grades, but not when the gradebook holds millions of them. Instead, each subject can keep a running
+# weighted sum and total weight that report_grade updates in O(1), so the average is a single division. Each student keeps the sum of
+# its subjects' current averages the same way: a subject tells its student how much its own average moved.
+# The grades themselves are stored column by column in typed arrays rather than as one namedtuple per grade.
+from array import array
+from math import fsum
+from operator import mul
+
+class RunningSubject(object):
+    def __init__(self, student=None):
+        self.student = student
+        self.scores = array('d')
+        self.weights = array('d')
+        self.weighted_sum = 0.0
+        self.total_weight = 0.0
+
+    def average_grade(self):
+        return self.weighted_sum / self.total_weight
+
+    def report_grade(self, score, weight):
+        self.scores.append(score)
+        self.weights.append(weight)
+        self._add(score * weight, weight)
+
+    def extend_grades(self, scores, weights):
+        # columnar version of report_grade for many grades at once
+        self.scores.extend(scores)
+        self.weights.extend(weights)
+        self._add(fsum(map(mul, scores, weights)), fsum(weights))
+
+    def _add(self, weighted, weight):
+        old = self.average_grade() if self.total_weight else None
+        self.weighted_sum += weighted
+        self.total_weight += weight
+        if self.student is not None:
+            self.student._subject_changed(old, self.average_grade())
+
+class RunningStudent(object):
+    def __init__(self):
+        self.subjects = {}
+        self.average_sum = 0.0   # sum of the current average of every graded subject
+        self.graded = 0
+
+    def subject(self, name):
+        if name not in self.subjects:
+            self.subjects[name] = RunningSubject(self)
+        return self.subjects[name]
+
+    def _subject_changed(self, old, new):
+        if old is None:
+            self.graded += 1
+            old = 0.0
+        self.average_sum += new - old
+
+    def average_grade(self):
+        return self.average_sum / self.graded
+
+class RunningGradebook(object):
+    def __init__(self):
+        self.students = {}
+
+    def student(self, name):
+        if name not in self.students:
+            self.students[name] = RunningStudent()
+        return self.students[name]
+
+    def ingest(self, names, subjects, scores, weights):
+        # bulk load parallel columns: group the rows once, then hand each subject its
+        # whole slice of grades in a single extend_grades call.
+        groups = {}
+        for i, key in enumerate(zip(names, subjects)):
+            groups.setdefault(key, []).append(i)
+        for (name, subject), rows in groups.items():
+            self.student(name).subject(subject).extend_grades(
+                array('d', (scores[i] for i in rows)),
+                array('d', (weights[i] for i in rows)))
+
+    def report(self):
+        # all students' averages straight from the running aggregates
+        return {name: student.average_sum / student.graded
+                for name, student in self.students.items() if student.graded}
+
+book   = RunningGradebook()
+albert = book.student('Albert Einstein')
+math   = albert.subject('Math')
+math.report_grade(75, 0.05)
+math.report_grade(65, 0.15)
+math.report_grade(70, 0.80)
+gym    = albert.subject('Gym')
+gym.report_grade(100, 0.40)
+gym.report_grade(85, 0.60)
+print(albert.average_grade())
+
+import random
+import time
+
+count = 1_000_000
+names = [f'student{random.randrange(1000)}' for _ in range(count)]
+subjects = [random.choice(('Math', 'Gym', 'Art', 'Science')) for _ in range(count)]
+scores = array('d', (random.randrange(100) for _ in range(count)))
+weights = array('d', (random.random() for _ in range(count)))
+
+start = time.perf_counter()
+book.ingest(names, subjects, scores, weights)
+print(f'ingest {count} grades: {time.perf_counter() - start:.3f}s')
+start = time.perf_counter()
+report = book.report()
+print(f'report for {len(report)} students: {time.perf_counter() - start:.4f}s')
+
 # NOTE:
 # Avoide making dicionaries with values that are other dictionaries or long tuples.
 # Use namedtuple for lightweight, immutalbe data containers before you need the flexibility of a full class.
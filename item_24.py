@@ -55,6 +55,9 @@ class LineCountWorker(Worker):
 # Let me apply this idea to the MapReduce classes. Here, I extend the InputData class with a generic class method that's responsible for ccreating new INputData instance using a common interface:
 
 
+import os
+from functools import partial
+
 class GenericInputData(object):
     def read(self):
         raise NotImplementedError
@@ -66,9 +69,17 @@ class GenericInputData(object):
 # I have generate_inputs take a dictionary with a set of configuration parameters that are up to the Inputdata concrete subclass to interpret.
 # I use the config to find te directory to list for input files:
 class PathInputData(GenericInputData):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
     def read(self):
         return open(self.path).read()
 
+    def read_chunks(self, size=1 << 20):
+        with open(self.path, 'rb') as f:
+            yield from iter(partial(f.read, size), b'')
+
     @classmethod
     def generate_inputs(cls, config):
         data_dir = config['data_dir']
@@ -76,3 +87,191 @@ class PathInputData(GenericInputData):
             yield cls(os.path.join(data_dir, name))
 
 
+
+# Similarly, I can make the Worker concrete subclasses generic with a class method that creates a worker for every input:
+
+class GenericWorker(object):
+    def __init__(self, input_data):
+        self.input_data = input_data
+        self.result     = None
+
+    def map(self):
+        raise NotImplementedError
+
+    def reduce(self, other):
+        raise NotImplementedError
+
+    @classmethod
+    def create_workers(cls, input_class, config):
+        workers = []
+        for input_data in input_class.generate_inputs(config):
+            workers.append(cls(input_data))
+        return workers
+
+# The line counter doesn't need to decode the whole file into one str just to count newlines.
+# Reading the file as bytes in fixed-size chunks keeps memory flat no matter how large the file is.
+
+class LineCountWorker(GenericWorker):
+    def map(self):
+        self.result = sum(chunk.count(b'\n') for chunk in self.input_data.read_chunks())
+
+    def reduce(self, other):
+        self.result += other.result
+
+# Now the mapreduce function is completely generic. The map calls are independent of each other, so they run
+# in a pool of processes (any concurrent.futures executor works). The results are then combined pairwise, round
+# by round, so the reduce step is a tree of depth log(n) rather than one long chain.
+
+from concurrent.futures import ProcessPoolExecutor
+
+def run_map(worker):
+    worker.map()
+    return worker
+
+def tree_reduce(workers):
+    while len(workers) > 1:
+        paired = []
+        for left, right in zip(workers[::2], workers[1::2]):
+            left.reduce(right)
+            paired.append(left)
+        if len(workers) % 2:
+            paired.append(workers[-1])
+        workers = paired
+    return workers[0].result
+
+def mapreduce(worker_class, input_class, config, executor=None):
+    workers = worker_class.create_workers(input_class, config)
+    if not workers:
+        return None
+    if executor is None:
+        with ProcessPoolExecutor() as pool:
+            workers = list(pool.map(run_map, workers))
+    else:
+        workers = list(executor.map(run_map, workers))
+    return tree_reduce(workers)
+
+# PathInputData still goes through the file object for every chunk. A byte-oriented input can memory-map the file instead
+# (see memory_map in cookbook/CH5__Files_and_IO/script_3.py) and hand out slices without decoding anything.
+# Since the input now works in byte offsets, one big file can also be cut into several byte ranges, so that several workers
+# share it. Each boundary is pushed forward to just after the next newline, so no line is ever split between two workers.
+
+import mmap
+
+def memory_map(filename, access=mmap.ACCESS_READ):
+    size = os.path.getsize(filename)
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        return mmap.mmap(fd, size, access=access)
+    finally:
+        os.close(fd)
+
+class MappedInputData(GenericInputData):
+    def __init__(self, path, start=0, end=None):
+        super().__init__()
+        self.path  = path
+        self.start = start
+        self.end   = end
+
+    def read(self):
+        return b''.join(self.read_chunks())
+
+    def read_chunks(self, size=1 << 20):
+        if not os.path.getsize(self.path):
+            return
+        with memory_map(self.path) as m:
+            end = len(m) if self.end is None else self.end
+            for pos in range(self.start, end, size):
+                yield m[pos:min(pos + size, end)]
+
+    def records(self):
+        # lines as bytes, without their newline
+        if not os.path.getsize(self.path):
+            return
+        with memory_map(self.path) as m:
+            pos = self.start
+            end = len(m) if self.end is None else self.end
+            while pos < end:
+                newline = m.find(b'\n', pos, end)
+                if newline == -1:
+                    yield m[pos:end]
+                    return
+                yield m[pos:newline]
+                pos = newline + 1
+
+    @staticmethod
+    def split_offsets(path, split_size):
+        size = os.path.getsize(path)
+        offsets = [0]
+        if size:
+            with memory_map(path) as m:
+                while offsets[-1] + split_size < size:
+                    newline = m.find(b'\n', offsets[-1] + split_size)
+                    if newline == -1 or newline + 1 >= size:
+                        break
+                    offsets.append(newline + 1)
+        offsets.append(size)
+        return offsets
+
+    @classmethod
+    def generate_inputs(cls, config):
+        data_dir   = config['data_dir']
+        split_size = config.get('split_size')
+        for name in os.listdir(data_dir):
+            path = os.path.join(data_dir, name)
+            if not split_size:
+                yield cls(path)
+                continue
+            offsets = cls.split_offsets(path, split_size)
+            for start, end in zip(offsets, offsets[1:]):
+                yield cls(path, start, end)
+
+class RecordCountWorker(GenericWorker):
+    def map(self):
+        self.result = sum(1 for _ in self.input_data.records())
+
+    def reduce(self, other):
+        self.result += other.result
+
+if __name__ == '__main__':
+    import random
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(32):
+            with open(os.path.join(tmpdir, str(i)), 'w') as f:
+                f.write('\n'.join('x' * random.randrange(1, 120) for _ in range(100_000)))
+
+        config = {'data_dir': tmpdir}
+
+        start = time.perf_counter()
+        serial = 0
+        for input_data in PathInputData.generate_inputs(config):
+            serial += input_data.read().count('\n')
+        print(f'serial str reads: {serial} lines in {time.perf_counter() - start:.3f}s')
+
+        start = time.perf_counter()
+        result = mapreduce(LineCountWorker, PathInputData, config)
+        print(f'mapreduce:        {result} lines in {time.perf_counter() - start:.3f}s')
+
+        start = time.perf_counter()
+        result = mapreduce(LineCountWorker, MappedInputData, config)
+        print(f'mmap, per file:   {result} lines in {time.perf_counter() - start:.3f}s')
+
+        # one large file split into newline-aligned byte ranges
+        with tempfile.TemporaryDirectory() as bigdir:
+            big = os.path.join(bigdir, 'big')
+            with open(big, 'wb') as out:
+                for name in os.listdir(tmpdir):
+                    with open(os.path.join(tmpdir, name), 'rb') as f:
+                        out.write(f.read() + b'\n')
+
+            for split_size in (None, 8 << 20):
+                single = {'data_dir': bigdir, 'split_size': split_size}
+                ranges = len(list(MappedInputData.generate_inputs(single)))
+                start = time.perf_counter()
+                result = mapreduce(LineCountWorker, MappedInputData, single)
+                print(f'mmap, {ranges:>2} ranges:   {result} lines in {time.perf_counter() - start:.3f}s')
+
+            single = {'data_dir': bigdir, 'split_size': 8 << 20}
+            print('records: ', mapreduce(RecordCountWorker, MappedInputData, single))
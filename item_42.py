@@ -64,6 +64,80 @@ print(fibonacci_smart)
 
 # Now, running the help function produces the expected result, even though the function is decorated.
 
+# Tracing fibonacci this way is exponential: every call recomputes both branches below it and prints a line for each one.
+# Here, I combine tracing with memoization in one decorator. Results are kept in a bounded LRU cache (an OrderedDict moved to
+# the end on every hit), with optional expiry after ttl seconds. Because the decorator replaces the module-level name, the
+# recursive calls inside the function go through the wrapper too, so they hit the cache. Only misses are traced, and the
+# hit/miss/eviction counts are exposed through cache_info() so the size can be tuned on real traffic.
+
+import time
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions', 'expired', 'maxsize', 'currsize'))
+_KWD_MARK = object()   # separates positional args from keyword pairs in a cache key, as functools does
+
+def memoize_trace(maxsize=128, ttl=None, trace=False):
+    def decorator(func):
+        cache = OrderedDict()
+        stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = args + (_KWD_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args
+            entry = cache.get(key)
+            if entry is not None:
+                result, expires = entry
+                if expires is None or expires > time.monotonic():
+                    stats['hits'] += 1
+                    cache.move_to_end(key)
+                    return result
+                stats['expired'] += 1
+                del cache[key]
+
+            stats['misses'] += 1
+            result = func(*args, **kwargs)
+            if trace:
+                print('%s (%r, %r) -> %r' % (func.__name__, args, kwargs, result))
+            cache[key] = (result, None if ttl is None else time.monotonic() + ttl)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+                stats['evictions'] += 1
+            return result
+
+        def cache_info():
+            return CacheInfo(maxsize=maxsize, currsize=len(cache), **stats)
+
+        def cache_clear():
+            cache.clear()
+            for name in stats:
+                stats[name] = 0
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+@memoize_trace(maxsize=64, trace=True)
+def fibonacci_memo(n):
+    """Return the n-th Fibonacci number"""
+    if n in (0, 1):
+        return n
+    return (fibonacci_memo(n-2) + fibonacci_memo(n-1))
+
+fibonacci_memo(10)
+print(fibonacci_memo.cache_info())
+print(fibonacci_memo)
+
+# With a cache smaller than the recursion depth, the counters show what is being thrown away:
+@memoize_trace(maxsize=8, ttl=60)
+def fibonacci_small(n):
+    if n in (0, 1):
+        return n
+    return (fibonacci_small(n-2) + fibonacci_small(n-1))
+
+fibonacci_small(300)
+print(fibonacci_small.cache_info())
+
 # Things to remember:
 # -> Decorator are python syntax for allowing one function to modify another function at runtime.
 # -> Using decorator can cause strange behaviors in tools that do introspection, succh as debugger.
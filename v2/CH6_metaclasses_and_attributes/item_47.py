@@ -173,6 +173,106 @@ class DictionaryRecord:
 # data = DictionaryRecord({'foo', 3})
 # print('foo: ', data.foo)
 
+# =====================================================================================
+# LazyRecord above loads one attribute per miss, and DictionaryRecord pays for a
+# __getattribute__ call on every access. When the rows live in a slow store, both are
+# the wrong shape: what costs money is the number of round trips, not the attributes.
+#
+# A better fit is to keep the __getattr__ fast path (hits go straight to the instance
+# dictionary and never reach my code), but on a miss load the whole row, and load it
+# together with every other record still waiting for its data. The records share a
+# loader, and the loader talks to a pluggable backend with a single fetch_many() method.
+
+import sqlite3
+
+class InMemoryBackend:
+    def __init__(self, rows) -> None:
+        self.rows = rows      # {key: {field: value}}
+        self.fetches = 0
+
+    def fetch_many(self, keys):
+        self.fetches += 1
+        return {key: self.rows[key] for key in keys if key in self.rows}
+
+class SQLiteBackend:
+    def __init__(self, connection, table, key_column='id') -> None:
+        self.connection = connection
+        self.table = table
+        self.key_column = key_column
+        self.fetches = 0
+
+    def fetch_many(self, keys):
+        self.fetches += 1
+        placeholders = ', '.join('?' * len(keys))
+        cursor = self.connection.execute(
+            f'SELECT * FROM {self.table} WHERE {self.key_column} IN ({placeholders})',
+            list(keys))
+        columns = [column[0] for column in cursor.description]
+        result = {}
+        for row in cursor:
+            values = dict(zip(columns, row))
+            result[values[self.key_column]] = values
+        return result
+
+class BatchLoader:
+    def __init__(self, backend, batch_size=500) -> None:
+        self.backend = backend
+        self.batch_size = batch_size   # keeps SQLite under its bound-parameter limit
+        self.pending = {}              # key -> records waiting for that row
+
+    def register(self, record):
+        self.pending.setdefault(record._key, []).append(record)
+
+    def load(self):
+        keys = list(self.pending)
+        for i in range(0, len(keys), self.batch_size):
+            chunk = keys[i:i + self.batch_size]
+            rows = self.backend.fetch_many(chunk)
+            # keys leave pending only once their rows are in, so if the backend raises,
+            # the records that weren't loaded are still queued for the next attempt
+            for key in chunk:
+                for record in self.pending.pop(key):
+                    record.__dict__.update(rows.get(key, {}))
+                    record.__dict__['_loaded'] = True
+
+class BatchedLazyRecord:
+    def __init__(self, key, loader) -> None:
+        self._key = key
+        self._loader = loader
+        self._loaded = False
+        loader.register(self)
+
+    def __getattr__(self, name):
+        # only called on a miss; loaded attributes never get here
+        if name.startswith('_') or self._loaded:
+            raise AttributeError(f"{type(self).__name__!r} has no attribute {name!r}")
+        self._loader.load()
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__!r} has no attribute {name!r}") from None
+
+# Here, I touch one attribute on each of 1,000 records. Only the first miss reaches the
+# backend, and it brings in every pending row at once in a couple of batches.
+backend = InMemoryBackend({i: {'name': f'user {i}', 'score': i * 2} for i in range(1000)})
+loader = BatchLoader(backend)
+records = [BatchedLazyRecord(i, loader) for i in range(1000)]
+print('Before: ', records[7].__dict__.keys())
+total = sum(record.score for record in records)
+print('After:  ', records[7].__dict__.keys())
+print('Total: ', total, 'fetches:', backend.fetches)
+
+# The same records work on top of SQLite, which stands in for the real store.
+connection = sqlite3.connect(':memory:')
+connection.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, score INTEGER)')
+connection.executemany('INSERT INTO users VALUES (?, ?, ?)',
+                       ((i, f'user {i}', i * 2) for i in range(1000)))
+backend = SQLiteBackend(connection, 'users')
+loader = BatchLoader(backend)
+records = [BatchedLazyRecord(i, loader) for i in range(1000)]
+print('First name: ', records[0].name, 'last name:', records[-1].name)
+print('fetches: ', backend.fetches)
+
 """
 Things to Remember
 ✦ Use __getattr__ and __setattr__ to lazily load and save attributes
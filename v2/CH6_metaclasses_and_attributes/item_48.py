@@ -238,6 +238,157 @@ class Bottom(Left, Right):
 # though there are two paths to it for the Bottom class through its Left and Right
 # parent classes.
 
+# =============================================================================================
+
+"""
+All of this validation runs at import time. With a handful of classes that doesn't matter,
+but a plugin system that defines thousands of classes through hierarchies like these can
+spend a noticeable part of its startup in metaclass __new__ and __init_subclass__ calls.
+
+The first step is to measure it. ClassCreationProfile temporarily wraps the __new__ of
+any metaclass and the __init_subclass__ of any class, and adds up how many times each one
+ran and for how long. The times are inclusive, so a hook that calls super() also counts
+the time spent in the parents' hooks.
+"""
+
+import hashlib
+import inspect
+import time
+import types
+
+class ClassCreationProfile:
+    def __init__(self) -> None:
+        self.totals = {}     # hook label -> [calls, nanoseconds]
+        self.patched = []    # (owner, attribute name, original value)
+
+    def _timed(self, label, func):
+        totals = self.totals.setdefault(label, [0, 0])
+
+        def wrapper(owner, *args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(owner, *args, **kwargs)
+            finally:
+                totals[0] += 1
+                totals[1] += time.perf_counter_ns() - start
+        return wrapper
+
+    def instrument_metaclass(self, meta):
+        original = meta.__dict__['__new__']
+        wrapper = self._timed(f'{meta.__qualname__}.__new__', original.__func__)
+        meta.__new__ = staticmethod(wrapper)
+        self.patched.append((meta, '__new__', original))
+
+    def instrument_init_subclass(self, cls):
+        original = cls.__dict__['__init_subclass__']
+        wrapper = self._timed(f'{cls.__qualname__}.__init_subclass__', original.__func__)
+        cls.__init_subclass__ = classmethod(wrapper)
+        self.patched.append((cls, '__init_subclass__', original))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for owner, name, original in reversed(self.patched):
+            setattr(owner, name, original)
+        self.patched.clear()
+
+    def report(self):
+        for label, (calls, elapsed) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            print(f'{label:<40} calls={calls:<6} total={elapsed / 1e6:8.3f}ms '
+                  f'per class={elapsed / max(calls, 1) / 1000:6.2f}us')
+
+"""
+Generated plugin classes are often identical in everything the validation looks at. So the
+second step is to remember what has already passed. Here, the validating metaclass hashes
+the parts of the class dictionary it cares about (plain values by repr, functions by their
+byte code plus the argument counts, kinds, defaults and annotations their signature is
+built from) and skips the expensive checks when that hash has already been
+validated once.
+"""
+
+def class_dict_hash(class_dict):
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(class_dict):
+        value = class_dict[key]
+        kind = type(value).__name__
+        if isinstance(value, (classmethod, staticmethod)):
+            value = value.__func__
+        # __module__, __qualname__ and the like differ for every class and aren't validated,
+        # but dunder methods such as __init_subclass__ are
+        if key.startswith('__') and not isinstance(value, types.FunctionType):
+            continue
+        if isinstance(value, types.FunctionType):
+            code = value.__code__
+            value = (code.co_code, code.co_consts, code.co_names, code.co_varnames,
+                     # what inspect.signature() is built from: argument counts and kinds
+                     # (co_flags marks *args and **kwargs), defaults and annotations
+                     code.co_argcount, code.co_posonlyargcount, code.co_kwonlyargcount,
+                     code.co_flags, value.__defaults__, value.__kwdefaults__, value.__annotations__)
+        digest.update(repr((key, kind, value)).encode())
+    return digest.digest()
+
+class ValidatePlugin(type):
+    cache_validation = False
+    validated = set()
+
+    def __new__(meta, name, bases, class_dict):
+        if not class_dict.get('is_root'):
+            key = class_dict_hash(class_dict) if meta.cache_validation else None
+            if key is None or key not in meta.validated:
+                meta.validate(class_dict)
+                if key is not None:
+                    meta.validated.add(key)
+        return type.__new__(meta, name, bases, class_dict)
+
+    @staticmethod
+    def validate(class_dict):
+        if class_dict['sides'] < 3:
+            raise ValueError('Polygons need 3+ sides')
+        if class_dict.get('color') not in ('red', 'green', 'blue'):
+            raise ValueError('Filled color must be supported')
+        # overridden hooks must keep the base parameters
+        for key, value in class_dict.items():
+            if isinstance(value, (classmethod, staticmethod)):
+                value = value.__func__
+            if isinstance(value, types.FunctionType) and key in PluginPolygon.__dict__:
+                # compare the plain functions; getattr() would bind a classmethod such as
+                # __init_subclass__ and drop its cls argument from the signature
+                base = PluginPolygon.__dict__[key]
+                if isinstance(base, (classmethod, staticmethod)):
+                    base = base.__func__
+                expected = inspect.signature(base).replace(return_annotation=inspect.Signature.empty)
+                if inspect.signature(value).parameters != expected.parameters:
+                    raise TypeError(f'{key} must have the signature {expected}')
+
+class PluginPolygon(metaclass=ValidatePlugin):
+    is_root = True
+    sides = None
+    color = None
+
+    def area(self, scale):
+        return 0
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls.angle_total = (cls.sides - 2) * 180
+
+def define_plugins(count):
+    for i in range(count):
+        def area(self, scale):
+            return self.sides * scale
+        class_dict = {'sides': 3 + i % 5, 'color': 'red', 'area': area}
+        ValidatePlugin(f'Plugin{i}', (PluginPolygon,), class_dict)
+
+for cached in (False, True):
+    ValidatePlugin.cache_validation = cached
+    with ClassCreationProfile() as profile:
+        profile.instrument_metaclass(ValidatePlugin)
+        profile.instrument_init_subclass(PluginPolygon)
+        define_plugins(5000)
+    print(f'cache_validation={cached}')
+    profile.report()
+
 """
 Things to Remember
 ✦ The __new__ method of metaclasses is run after the class
@@ -170,6 +170,254 @@ print('After: ', deserialize(data))
 # This works well for serialization, as I've shown, and also applies to database
 # object-relational mappings (ORMs), extensible plug-in system, and callback hooks
 
+# ========================================================================================
+
+# The registry also makes bulk loading cheap. deserialize() above handles one object at a
+# time: parse a string, look up the class, call it. When a file holds millions of
+# serialized objects, most of that work is repeated for nothing. Instead, I can stream the
+# payloads out of the file (either one JSON document per line, or one big JSON array),
+# group their args by class name, and then build each group with a single constructor
+# lookup.
+
+import re
+import struct
+from itertools import chain, islice, starmap
+
+def iter_payloads(file, batch_lines=10_000, chunk_size=1 << 16):
+    first = file.read(1)
+    while first and first.isspace():
+        first = file.read(1)
+    if not first:
+        return
+    if first != '[':
+        # newline-delimited JSON: join a batch of lines into one array so that the
+        # C parser runs once per batch instead of once per line.
+        lines = chain([first + file.readline()], file)
+        while True:
+            batch = [line for line in islice(lines, batch_lines) if line.strip()]
+            if not batch:
+                return
+            yield from json.loads('[' + ','.join(batch) + ']')
+
+    # a JSON array: decode one item at a time from a buffer refilled in chunks
+    decoder = json.JSONDecoder()
+    separators = re.compile(r'[\s,]*')
+    buffer = ''
+    pos = 0
+    eof = False
+    while True:
+        pos = separators.match(buffer, pos).end()
+        if buffer.startswith(']', pos):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+        pos = end
+
+def deserialize_bulk(file):
+    grouped = {}
+    for params in iter_payloads(file):
+        grouped.setdefault(params['class'], []).append(params['args'])
+    return {name: list(starmap(registry[name], args)) for name, args in grouped.items()}
+
+# For another process that doesn't need JSON at all, each group can be written out in a
+# compact binary form: the class name, the number of objects and their arity, a type code
+# for each arg position ('q' for a 64-bit int, 'd' for a double), followed by all of the
+# args packed back to back. A position that holds ints for some objects and floats for
+# others is rejected rather than silently turning the ints into floats.
+
+binary_codes = {int: 'q', float: 'd'}
+
+def dump_binary(grouped, out):
+    for name, objects in grouped.items():
+        arity = len(objects[0].args)
+        codes = ''
+        for position in range(arity):
+            kinds = {type(obj.args[position]) for obj in objects}
+            if len(kinds) != 1 or not kinds <= binary_codes.keys():
+                raise TypeError(f'{name} arg {position} must be all int or all float, '
+                                f'got {sorted(kind.__name__ for kind in kinds)}')
+            codes += binary_codes[kinds.pop()]
+        layout = struct.Struct('<' + codes)
+        encoded = name.encode()
+        out.write(struct.pack('<H', len(encoded)) + encoded)
+        out.write(struct.pack('<IH', len(objects), arity) + codes.encode())
+        out.write(b''.join(layout.pack(*obj.args) for obj in objects))
+
+def load_binary(data):
+    grouped = {}
+    offset = 0
+    while offset < len(data):
+        (size,) = struct.unpack_from('<H', data, offset)
+        offset += 2
+        name = bytes(data[offset:offset + size]).decode()
+        offset += size
+        count, arity = struct.unpack_from('<IH', data, offset)
+        offset += struct.calcsize('<IH')
+        layout = struct.Struct('<' + bytes(data[offset:offset + arity]).decode())
+        offset += arity
+        end = offset + count * layout.size
+        grouped[name] = list(starmap(registry[name], layout.iter_unpack(data[offset:end])))
+        offset = end
+    return grouped
+
+# Here, I compare the bulk decoder with calling json.loads + deserialize on each line of
+# a file holding 100,000 objects.
+
+import io
+import time
+
+class Point3D(BetterRegisteredSerializable):
+    def __init__(self, x, y, z):
+        super().__init__(x, y, z)
+        self.x, self.y, self.z = x, y, z
+
+lines = []
+for i in range(50_000):
+    lines.append(Point3D(i, -i, i * 2).serialize())
+    lines.append(Vector1D(i).serialize())
+ndjson = '\n'.join(lines)
+array_json = '[' + ', '.join(lines) + ']'
+
+start = time.perf_counter()
+one_at_a_time = [deserialize(line) for line in io.StringIO(ndjson)]
+print(f'deserialize per line: {time.perf_counter() - start:.3f}s')
+
+start = time.perf_counter()
+grouped = deserialize_bulk(io.StringIO(ndjson))
+print(f'bulk, ndjson:         {time.perf_counter() - start:.3f}s')
+
+start = time.perf_counter()
+grouped = deserialize_bulk(io.StringIO(array_json))
+print(f'bulk, json array:     {time.perf_counter() - start:.3f}s')
+
+out = io.BytesIO()
+dump_binary(grouped, out)
+start = time.perf_counter()
+from_binary = load_binary(out.getbuffer())
+print(f'binary:               {time.perf_counter() - start:.3f}s')
+print('sizes: ', len(ndjson), 'bytes of json,', len(out.getvalue()), 'bytes of binary')
+print('After: ', from_binary['Point3D'][1], from_binary['Vector1D'][1])
+
+# Grouping doesn't buy much for JSON input: running each class's __init__ (and its super()
+# chain) is most of the cost, so the bulk decoder is only a few percent faster than
+# per-line deserialize() for ndjson, and somewhat slower for one big JSON array, where
+# items are decoded one raw_decode() call at a time. Its use is streaming a large file
+# grouped by class. The binary form is the one that pays off: it skips parsing altogether,
+# loads about three times faster and is a third the size.
+
+# ========================================================================================
+
+# The same registry can drive a proper binary codec, one record at a time. Each distinct
+# combination of class and constructor arg types in a batch gets a numeric layout id and a
+# struct.Struct derived from those types ('q' for ints, 'd' for floats), so Vector3D(0, 1, 2)
+# and Vector3D(0.5, 1, 2) simply use two layouts. A batch starts with a small schema header
+# listing, for every layout id it uses, the class name and the struct format, followed by
+# the records: a 2-byte layout id and the packed args. Because the header names the classes,
+# the decoding process only needs the same classes registered, in any order. The whole
+# batch is packed into a single bytearray, and decoding reads straight out of a memoryview
+# with unpack_from, without slicing or copying the input.
+
+class BinaryCodec:
+    type_codes = {int: 'q', float: 'd', bool: '?'}
+
+    def __init__(self):
+        self.structs = {}       # format string -> struct.Struct, shared by batches
+
+    def _struct(self, fmt):
+        if fmt not in self.structs:
+            self.structs[fmt] = struct.Struct(fmt)
+        return self.structs[fmt]
+
+    def _codes(self, obj, kinds):
+        try:
+            return ''.join(self.type_codes[kind] for kind in kinds)
+        except KeyError:
+            raise TypeError(f'{obj!r} has args that are not int, float or bool') from None
+
+    def pack_many(self, objects):
+        layouts = {}            # (class name, arg types) -> (layout id, struct.Struct)
+        records = []
+        for obj in objects:
+            key = (obj.__class__.__name__, tuple(map(type, obj.args)))
+            entry = layouts.get(key)
+            if entry is None:
+                entry = layouts[key] = (len(layouts), self._struct('<H' + self._codes(obj, key[1])))
+            records.append(entry + (obj,))
+
+        header = bytearray(struct.pack('<H', len(layouts)))
+        for (name, _), (layout_id, layout) in layouts.items():
+            name, fmt = name.encode(), layout.format.encode()
+            header += struct.pack('<HB', layout_id, len(name)) + name
+            header += struct.pack('<B', len(fmt)) + fmt
+
+        out = bytearray(len(header) + sum(layout.size for _, layout, _ in records))
+        out[:len(header)] = header
+        offset = len(header)
+        for layout_id, layout, obj in records:
+            layout.pack_into(out, offset, layout_id, *obj.args)
+            offset += layout.size
+        return out
+
+    def unpack_many(self, data):
+        view = memoryview(data)
+        (nlayouts,) = struct.unpack_from('<H', view, 0)
+        offset = 2
+        layouts = {}            # layout id -> (constructor, struct.Struct)
+        for _ in range(nlayouts):
+            layout_id, size = struct.unpack_from('<HB', view, offset)
+            offset += 3
+            name = bytes(view[offset:offset + size]).decode()
+            offset += size
+            (size,) = struct.unpack_from('<B', view, offset)
+            offset += 1
+            fmt = bytes(view[offset:offset + size]).decode()
+            offset += size
+            layouts[layout_id] = (registry[name], self._struct(fmt))
+
+        read_id = struct.Struct('<H').unpack_from
+        objects = []
+        end = len(view)
+        while offset < end:
+            (layout_id,) = read_id(view, offset)
+            constructor, layout = layouts[layout_id]
+            values = layout.unpack_from(view, offset)
+            objects.append(constructor(*values[1:]))
+            offset += layout.size
+        return objects
+
+# Here, I compare the JSON and binary paths on size and speed for a mix of points and
+# vectors.
+
+codec = BinaryCodec()
+objects = []
+for i in range(50_000):
+    objects.append(EvenBetterPoint2D(i, -i))
+    objects.append(Vector3D(i * 0.5, i, -i))
+
+start = time.perf_counter()
+json_data = [obj.serialize() for obj in objects]
+json_decoded = [deserialize(data) for data in json_data]
+json_time = time.perf_counter() - start
+
+start = time.perf_counter()
+packed = codec.pack_many(objects)
+binary_decoded = codec.unpack_many(packed)
+binary_time = time.perf_counter() - start
+
+assert [o.args for o in binary_decoded] == [tuple(o.args) for o in json_decoded]
+print(f'json:   {sum(map(len, json_data)):>9} bytes, {json_time:.3f}s')
+print(f'binary: {len(packed):>9} bytes, {binary_time:.3f}s')
+print('After: ', binary_decoded[2], binary_decoded[3])
+
 """
 Things to Remember
 
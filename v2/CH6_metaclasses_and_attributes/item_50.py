@@ -122,6 +122,104 @@ class FixedCustomer:
 cust = FixedCustomer()
 print(cust.first_name)
 
+# ----------------------------------------------------------------------------
+# Because each Field now knows its own name, the class itself knows its table schema.
+# Here, I build a small row-mapping layer on top of that. __init_subclass__ collects the
+# fields in declaration order (inherited ones first), and the SQL statements are derived
+# from them once per class. Loading reads the cursor in batches with fetchmany, and
+# hydrates each object by filling its instance dictionary directly under the fields'
+# internal names, which skips a descriptor __set__ and a setattr for every column of
+# every row.
+
+import sqlite3
+import time
+
+class Column(Field):
+    def __init__(self, sql_type='TEXT') -> None:
+        super().__init__()
+        self.sql_type = sql_type
+
+class SQLiteRow:
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        # base class columns first; a subclass redefining a column keeps its position
+        columns = {}
+        for base in reversed(cls.__mro__):
+            for name, value in vars(base).items():
+                if isinstance(value, Column):
+                    columns[name] = value
+        cls._columns = list(columns.values())
+        cls._table = cls.__name__.lower()
+        names = ', '.join(column.name for column in cls._columns)
+        placeholders = ', '.join('?' for _ in cls._columns)
+        cls._select_sql = f'SELECT {names} FROM {cls._table}'
+        cls._insert_sql = f'INSERT INTO {cls._table} ({names}) VALUES ({placeholders})'
+
+    @classmethod
+    def create_table(cls, connection):
+        columns = ', '.join(f'{column.name} {column.sql_type}' for column in cls._columns)
+        connection.execute(f'CREATE TABLE IF NOT EXISTS {cls._table} ({columns})')
+
+    @classmethod
+    def save_many(cls, connection, rows):
+        names = [column.internal_name for column in cls._columns]
+        connection.executemany(
+            cls._insert_sql,
+            ([row.__dict__.get(name, '') for name in names] for row in rows))
+        connection.commit()
+
+    @classmethod
+    def load(cls, connection, batch_size=10_000):
+        names = [column.internal_name for column in cls._columns]
+        new = cls.__new__
+        cursor = connection.execute(cls._select_sql)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            for values in batch:
+                row = new(cls)
+                row.__dict__.update(zip(names, values))
+                yield row
+
+class DatabaseCustomer(SQLiteRow):
+    first_name = Column()
+    last_name = Column()
+    prefix = Column()
+    suffix = Column()
+    age = Column('INTEGER')
+
+# Here, I save and load customers, and compare hydration through the descriptors with
+# filling __dict__ directly. Raise N to 1_000_000 for the full-size benchmark.
+N = 100_000
+connection = sqlite3.connect(':memory:')
+DatabaseCustomer.create_table(connection)
+
+customers = []
+for i in range(N):
+    cust = DatabaseCustomer()
+    cust.first_name, cust.last_name = f'First{i}', f'Last{i}'
+    cust.prefix, cust.suffix, cust.age = 'Dr.', 'Jr.', i % 100
+    customers.append(cust)
+
+start = time.perf_counter()
+DatabaseCustomer.save_many(connection, customers)
+print(f'save {N} rows:               {time.perf_counter() - start:.3f}s')
+
+start = time.perf_counter()
+loaded = list(DatabaseCustomer.load(connection))
+print(f'load, filling __dict__:       {time.perf_counter() - start:.3f}s')
+
+start = time.perf_counter()
+slow = []
+for values in connection.execute(DatabaseCustomer._select_sql):
+    cust = DatabaseCustomer()
+    for column, value in zip(DatabaseCustomer._columns, values):
+        setattr(cust, column.name, value)
+    slow.append(cust)
+print(f'load, setattr per column:     {time.perf_counter() - start:.3f}s')
+print(loaded[7].first_name, loaded[7].age, loaded[7].__dict__ == slow[7].__dict__)
+
 """
 Things to Remember
 
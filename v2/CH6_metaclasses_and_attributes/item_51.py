@@ -100,6 +100,135 @@ class TraceMeta(type):
 # # except KeyError:
 # #     pass # expected
 
+# ========================================================================================
+
+"""
+The decorators above print a repr() of every argument and result on every call. That is
+fine for a quick debugging session, but far too slow to leave on a hot class like
+TraceDict. A cheaper version records structured events instead: which function ran, when,
+for how long, and with how many arguments. The events go into a fixed-size ring buffer and
+are only formatted when somebody asks to see them.
+
+Because a class decorator keeps a reference to the class it modified, it can also remember
+what it replaced. Turning tracing off puts the original methods back, so a disabled tracer
+costs nothing at all.
+"""
+
+import time
+from collections import deque
+
+traceable_types = (
+    types.FunctionType,
+    types.WrapperDescriptorType,
+    types.MethodDescriptorType,
+)
+
+class Tracer:
+    def __init__(self, capacity=1024, exclude=('__getattribute__',)):
+        self.events = deque(maxlen=capacity)
+        self.exclude = set(exclude)
+        self.enabled = False
+        self.classes = {}  # class -> {name: original value in its __dict__, or None}
+
+    def record_func(self, func):
+        events = self.events
+        name = func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            error = None
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                error = type(e)
+                raise
+            finally:
+                end = time.perf_counter_ns()
+                events.append((name, start, end - start, len(args) + len(kwargs), error))
+
+        wrapper.tracing = True
+        return wrapper
+
+    def __call__(self, klass):
+        originals = {}
+        for key in dir(klass):
+            if key in self.exclude:
+                continue
+            # look at the raw class attributes so bound classmethods and staticmethods
+            # like __new__ are left alone; only instance methods are traced.
+            value = None
+            for base in klass.__mro__:
+                if key in base.__dict__:
+                    value = base.__dict__[key]
+                    break
+            if isinstance(value, traceable_types):
+                originals[key] = klass.__dict__.get(key)
+        self.classes[klass] = originals
+        if self.enabled:
+            self._patch(klass, originals)
+        return klass
+
+    def _patch(self, klass, originals):
+        for key in originals:
+            setattr(klass, key, self.record_func(getattr(klass, key)))
+
+    def _restore(self, klass, originals):
+        for key, original in originals.items():
+            if original is None:
+                delattr(klass, key)  # was inherited, lookup falls back to the base
+            else:
+                setattr(klass, key, original)
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            for klass, originals in self.classes.items():
+                self._patch(klass, originals)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            for klass, originals in self.classes.items():
+                self._restore(klass, originals)
+
+    def dump(self, limit=None):
+        events = list(self.events)
+        if limit is not None:
+            events = events[-limit:]
+        for name, start, elapsed, nargs, error in events:
+            outcome = f'raised {error.__name__}' if error else 'ok'
+            print(f'{start:>20} {name:<24} args={nargs} {elapsed / 1000:8.2f}us {outcome}')
+
+
+tracer = Tracer(capacity=8)
+
+@tracer
+class FastTraceDict(dict):
+    pass
+
+fast_dict = FastTraceDict([('hi', 1)])
+tracer.enable()
+fast_dict['there'] = 2
+fast_dict['hi']
+try:
+    fast_dict['does not exist']
+except KeyError:
+    pass # expected
+tracer.disable()
+fast_dict['not traced'] = 3
+tracer.dump()
+
+# With tracing off, the class is back to plain dict methods, so there is nothing left
+# to pay for on each call.
+assert '__getitem__' not in FastTraceDict.__dict__
+
+from timeit import timeit
+print('disabled:', timeit(lambda: fast_dict['hi'], number=100000))
+tracer.enable()
+print('enabled: ', timeit(lambda: fast_dict['hi'], number=100000))
+tracer.disable()
+
 """
 Things to Remember
 